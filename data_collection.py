@@ -1,7 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime
+import asyncio
+import hashlib
+import tempfile
+import time
 import pandas as pd
 import sqlite3
-import requests
+import aiohttp
+import orjson
 from meteostat import Point, Daily
 from epiweeks import Week
 import os
@@ -10,10 +15,33 @@ import os
 START_DATE = datetime(2020, 3, 1)
 END_DATE = datetime(2023, 3, 1)
 COVID_BASE_URL = "https://api.covidactnow.org/v2"
+FLU_BASE_URL = "https://api.delphi.cmu.edu/epidata/fluview/"
+FLU_REGIONS = {"mi": 1, "nat": 2}
+FLU_EPIWEEKS = "202010-202310"
+
+# Whole weeks between START_DATE and END_DATE; a table holding at least this many
+# weekly rows per region is treated as fully collected
+EXPECTED_WEEKS = (END_DATE - START_DATE).days // 7
+
+# HTTP Constants
+HTTP_POOL_SIZE = 4
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.3
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+HTTP_CACHE_TTL = 6 * 60 * 60  # seconds
+HTTP_MAX_RESPONSE_BYTES = 50_000_000
+HTTP_READ_CHUNK_BYTES = 64 * 1024
+WEATHER_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+# Cache Constants
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
 
 COVID_API_KEY_ENV = "COVID_ACT_NOW_API_KEY"
 FLU_API_KEY_ENV = "FLUVIEW_API_KEY"
 
+# Shared database connection, see get_db_connection
+_CONN = None
+
 # Location Constants
 MICHIGAN_LOCATION = Point(42.3314, -83.0458)  # Detroit, Michigan
 NATIONAL_LOCATIONS = {
@@ -27,69 +55,62 @@ NATIONAL_LOCATIONS = {
 def create_database():
     """Create the database and all required tables if they don't exist"""
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        db_path = os.path.join(script_dir, "final_project.db")
-
-        # Create a new database connection
-        conn = sqlite3.connect(db_path)
-
-        # Enable foreign key support
-        conn.execute("PRAGMA foreign_keys = ON")
+        conn = get_db_connection()
 
         # Create run counts table
         conn.execute("""
-        CREATE TABLE IF NOT EXISTS run_counts (
-            table_name TEXT PRIMARY KEY,
-            run_count INTEGER DEFAULT 0
-        )
-        """)
-        
-        # Create weather tables
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS national_weather_data (
-            time TEXT PRIMARY KEY,
-            tavg REAL,
-            tmin REAL,
-            tmax REAL
-        )
-        """)
-        
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS michigan_weather_data (
-            week_id INTEGER PRIMARY KEY,
-            tavg_f REAL,
-            tmin_f REAL,
-            tmax_f REAL
-        )
-        """)
-        
-        # Create COVID tables
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS daily_michigan_covid_data (
-            date TEXT PRIMARY KEY,
-            cases INTEGER
-        )
-        """)
-        
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS weekly_michigan_covid_data (
-            week_id INTEGER PRIMARY KEY,
-            weekly_cases INTEGER
-        )
-        """)
-        
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS daily_national_covid_data (
-            date TEXT PRIMARY KEY,
-            cases INTEGER
-        )
-        """)
-        
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS weekly_national_covid_data (
-            week_id INTEGER PRIMARY KEY,
-            weekly_cases INTEGER
-        )
+        CREATE TABLE IF NOT EXISTS run_counts (
+            table_name TEXT PRIMARY KEY,
+            run_count INTEGER DEFAULT 0
+        )
+        """)
+        
+        # Create weather tables
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS national_weather_data (
+            time TEXT PRIMARY KEY,
+            tavg REAL,
+            tmin REAL,
+            tmax REAL
+        )
+        """)
+        
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS michigan_weather_data (
+            week_id INTEGER PRIMARY KEY,
+            tavg_f REAL,
+            tmin_f REAL,
+            tmax_f REAL
+        )
+        """)
+        
+        # Create COVID tables
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_michigan_covid_data (
+            date TEXT PRIMARY KEY,
+            cases INTEGER
+        )
+        """)
+        
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS weekly_michigan_covid_data (
+            week_id INTEGER PRIMARY KEY,
+            weekly_cases INTEGER
+        )
+        """)
+        
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_national_covid_data (
+            date TEXT PRIMARY KEY,
+            cases INTEGER
+        )
+        """)
+        
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS weekly_national_covid_data (
+            week_id INTEGER PRIMARY KEY,
+            weekly_cases INTEGER
+        )
         """)
 
         # Create flu data table
@@ -103,6 +124,13 @@ def create_database():
         )
         """)
 
+        # The daily tables are keyed on their date column already; the flu
+        # table is read back grouped by week per region, so index that path
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_flu_region_week
+        ON flu_data_march_2020_to_2023 (region_key, week_id)
+        """)
+
         conn.commit()
         print("Database and tables created successfully")
         return True
@@ -111,14 +139,33 @@ def create_database():
         print(f"Error creating database: {str(e)}")
         return False
 
-    finally:
-        if conn:
-            conn.close()
+def _apply_pragmas(conn):
+    # WAL lets readers run alongside the writer and NORMAL sync skips the
+    # per-commit fsync that the default rollback journal needs
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")
+    conn.execute("PRAGMA foreign_keys = ON")
 
 def get_db_connection():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(script_dir, "final_project.db")
-    return sqlite3.connect(db_path)
+    """Return the shared connection, opening it on first use"""
+    global _CONN
+    if _CONN is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        db_path = os.path.join(script_dir, "final_project.db")
+        # Autocommit mode; the ingestion functions open explicit transactions
+        _CONN = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        _apply_pragmas(_CONN)
+    return _CONN
+
+def close_db():
+    """Close the shared connection if it is open"""
+    global _CONN
+    if _CONN is not None:
+        _CONN.close()
+        _CONN = None
 
 def get_api_key(env_var_name):
     api_key = os.getenv(env_var_name)
@@ -128,310 +175,383 @@ def get_api_key(env_var_name):
         )
     return api_key
 
-def initialize_run_counts():
-    conn = get_db_connection()
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS run_counts (
-        table_name TEXT PRIMARY KEY,
-        run_count INTEGER DEFAULT 0
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-def get_run_count(table_name):
-    conn = get_db_connection()
-    result = conn.execute("SELECT run_count FROM run_counts WHERE table_name = ?", (table_name,)).fetchone()
-    conn.close()
-    return result[0] if result else 0
-
-def increment_run_count(table_name):
-    conn = get_db_connection()
-    conn.execute("""
+def record_run(conn, table_name):
+    """Increment and return the run number for table_name in a single statement"""
+    return conn.execute("""
     INSERT INTO run_counts (table_name, run_count)
     VALUES (?, 1)
     ON CONFLICT(table_name) DO UPDATE SET run_count = run_count + 1
-    """, (table_name,))
-    conn.commit()
-    conn.close()
+    RETURNING run_count
+    """, (table_name,)).fetchone()[0]
 
-def get_table_row_count(table_name):
-    conn = get_db_connection()
+def get_table_row_count(conn, table_name):
     result = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()
-    conn.close()
     return result[0] if result else 0
 
-def get_week_id(date):
-    parsed_date = datetime.strptime(date, '%Y-%m-%d')
-    return int(parsed_date.strftime('%Y%U'))
+def week_id_series(dates, monday_start=False):
+    """
+    Vectorized week_id for a datetime Series: '%Y%U' (Sunday-start week of
+    year) by default, or '%Y%W' (Monday-start) when monday_start is set
+    """
+    offset = dates.dt.dayofweek if monday_start else (dates.dt.dayofweek + 1) % 7
+    return dates.dt.year * 100 + (dates.dt.dayofyear + 6 - offset) // 7
+
+def get_week_id(day, monday_start=False):
+    """Scalar counterpart of week_id_series for a 'YYYY-MM-DD' string or date"""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    offset = day.weekday() if monday_start else (day.weekday() + 1) % 7
+    return day.year * 100 + (day.timetuple().tm_yday + 6 - offset) // 7
+
+def get_cache_path(url, params=None):
+    key = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def is_cache_fresh(path, ttl):
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl
+
+def fetch_daily_weather(location, start_date, end_date):
+    """Fetch daily weather from meteostat, reusing a parquet copy while it is fresh"""
+    cache_path = os.path.join(
+        CACHE_DIR,
+        f"weather_{location._lat}_{location._lon}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet"
+    )
+    # The cache is best-effort: a missing parquet engine or unreadable file
+    # falls back to fetching from meteostat
+    if is_cache_fresh(cache_path, WEATHER_CACHE_TTL):
+        try:
+            return pd.read_parquet(cache_path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Ignoring weather cache: {e}")
+
+    data = Daily(location, start_date, end_date).fetch()
+
+    # meteostat signals a failed download with an empty frame; don't pin that
+    if not data.empty:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            data.to_parquet(cache_path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Skipping weather cache: {e}")
+    return data
 
 def process_weather_data(location, start_date, end_date, table_name):
     """
-    Process weather data with proper run count handling:
-    - Runs 1-4: Collect exactly 25 new rows per run
-    - Run 5: Collect all remaining data
-    - Runs 6+: No new data collection
+    Process weather data in a single idempotent pass:
+    - Upserts every daily row in the window (unchanged rows are left alone)
+    - Recomputes the weekly aggregation
+    - Skips collection once the weekly table already covers the window
     """
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        run_count = get_run_count("national_weather_data")
-
-        # Check if we already have complete data (run 5+)
-        if run_count >= 5:
+        # Check if we already have complete data
+        if get_table_row_count(conn, table_name) >= EXPECTED_WEEKS:
             print("Weather data already complete. Skipping collection.")
             return
 
-        # Get current data count
-        current_count = conn.execute("SELECT COUNT(*) FROM national_weather_data").fetchone()[0] or 0
-
         # Fetch data from API
-        data = Daily(location, start_date, end_date).fetch()
+        data = fetch_daily_weather(location, start_date, end_date)
         data.index = data.index.to_series().apply(pd.to_datetime)
         data.reset_index(inplace=True)
         data = data.rename(columns={"index": "time"})
 
-        # For runs 1-4, limit to next 25 rows after current count
-        if run_count < 4:
-            start_idx = current_count
-            end_idx = start_idx + 25
-            data = data.iloc[start_idx:end_idx]
-
-        # Insert new daily records
-        for _, row in data.iterrows():
-            conn.execute("""
-            INSERT OR IGNORE INTO national_weather_data (time, tavg, tmin, tmax)
-            VALUES (?, ?, ?, ?)
-            """, (
-                row['time'].strftime('%Y-%m-%d'),
-                row.get('tavg'),
-                row.get('tmin'),
-                row.get('tmax')
-            ))
-        
-        # Update weekly aggregation
-        weekly_data = conn.execute(f"""
-        WITH weekly_temps AS (
-            SELECT
-                CAST(strftime('%Y', time) AS INTEGER) * 100 + CAST(strftime('%W', time) AS INTEGER) AS week_id,
-                AVG((tavg * 9/5) + 32) AS tavg_f,
-                AVG((tmin * 9/5) + 32) AS tmin_f,
-                AVG((tmax * 9/5) + 32) AS tmax_f
-            FROM national_weather_data
-            WHERE time BETWEEN ? AND ?
-            GROUP BY week_id
-            ORDER BY week_id
-        )
-        SELECT * FROM weekly_temps
-        """, (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))).fetchall()
-        
-        for week in weekly_data:
-            conn.execute(f"""
-            INSERT OR REPLACE INTO "{table_name}" (week_id, tavg_f, tmin_f, tmax_f)
-            VALUES (?, ?, ?, ?)
-            """, week)
+        conn.execute("BEGIN IMMEDIATE")
+
+        # Insert new daily records and apply any revised readings in a single batch,
+        # so the stored daily rows match the frame the weekly averages come from
+        rows = list(zip(
+            data['time'].dt.strftime('%Y-%m-%d'),
+            data['tavg'],
+            data['tmin'],
+            data['tmax']
+        ))
+        changed = conn.executemany("""
+        INSERT INTO national_weather_data (time, tavg, tmin, tmax)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(time) DO UPDATE SET
+            tavg = excluded.tavg, tmin = excluded.tmin, tmax = excluded.tmax
+        WHERE tavg IS NOT excluded.tavg
+           OR tmin IS NOT excluded.tmin
+           OR tmax IS NOT excluded.tmax
+        """, rows).rowcount
+        
+        # Update weekly aggregation from the days already in memory
+        week_id = week_id_series(data['time'], monday_start=True).rename('week_id')
+        weekly_data = (
+            (data[['tavg', 'tmin', 'tmax']] * 9 / 5 + 32)
+            .groupby(week_id)
+            .mean()
+            .reset_index()
+        )
+        conn.executemany(f"""
+        INSERT OR REPLACE INTO "{table_name}" (week_id, tavg_f, tmin_f, tmax_f)
+        VALUES (?, ?, ?, ?)
+        """, weekly_data.itertuples(index=False, name=None))
 
-        conn.commit()
+        current_run = record_run(conn, "national_weather_data")
+        conn.execute("COMMIT")
 
         # Print status
-        new_count = conn.execute("SELECT COUNT(*) FROM national_weather_data").fetchone()[0]
-        weekly_count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
-
-        increment_run_count("national_weather_data")
-        current_run = run_count + 1
         print(f"Weather data processing complete (Run {current_run}):")
-        print(f"- Previous daily records: {current_count}")
-        print(f"- New daily records: {new_count}")
-        print(f"- Records added this run: {new_count - current_count}")
-        print(f"- Weekly aggregated weather in {table_name}: {weekly_count} rows")
+        print(f"- Daily records fetched: {len(data)}")
+        print(f"- Records added or revised this run: {changed}")
+        print(f"- Weekly aggregated weather in {table_name}: {len(weekly_data)} rows")
 
     except Exception as e:
         print(f"Error processing weather data: {str(e)}")
-        if conn:
-            conn.rollback()
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
         raise
-    finally:
-        if conn:
-            conn.close()
 
-def store_covid_data(data, table_name):
+def write_covid_data(conn, data, table_name):
+    """Write one COVID payload inside the caller's transaction, returning a status summary"""
+    daily_table = "daily_" + table_name.replace("weekly_", "")
+
+    # Bind plain tuples straight from the JSON
+    rows = [(record['date'][:10], record.get('cases')) for record in data]
+
+    # Insert new daily records and apply any revised counts in a single batch,
+    # so the stored daily rows match the payload the weekly totals come from
+    changed = conn.executemany(f"""
+    INSERT INTO "{daily_table}" (date, cases)
+    VALUES (?, ?)
+    ON CONFLICT(date) DO UPDATE SET cases = excluded.cases
+    WHERE cases IS NOT excluded.cases
+    """, rows).rowcount
+
+    # Update weekly aggregation from the days already in memory,
+    # turning cumulative cases into daily new cases before summing
+    start, end = START_DATE.strftime('%Y-%m-%d'), END_DATE.strftime('%Y-%m-%d')
+    weekly_cases = {}
+    previous_cases = None
+    for day, cases in sorted(row for row in rows if row[1] is not None and start <= row[0] <= end):
+        if previous_cases is not None:
+            week_id = get_week_id(day, monday_start=True)
+            weekly_cases[week_id] = weekly_cases.get(week_id, 0) + cases - previous_cases
+        previous_cases = cases
+    conn.executemany(f"""
+    INSERT OR REPLACE INTO "{table_name}" (week_id, weekly_cases)
+    VALUES (?, ?)
+    """, weekly_cases.items())
+
+    current_run = record_run(conn, table_name)
+    return table_name, current_run, len(rows), changed, len(weekly_cases)
+
+def store_covid_data(datasets):
+    """Store (data, table_name) COVID payloads together in one transaction"""
     conn = get_db_connection()
     try:
-        run_count = get_run_count(table_name)
-
-        # Check if we already have complete data (run 5+)
-        if run_count >= 5:
-            print(f"{table_name} already complete. Skipping collection.")
-            return
-
-        # Get current data count
-        daily_table = "daily_" + table_name.replace("weekly_", "")
-        current_count = conn.execute(f'SELECT COUNT(*) FROM "{daily_table}"').fetchone()[0] or 0
-
-        # Process the data
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-
-        # For runs 1-4, limit to next 25 rows after current count
-        if run_count < 4:
-            df = df.iloc[current_count:current_count + 25]
-
-        # Insert new daily records
-        for _, row in df.iterrows():
-            conn.execute(f"""
-            INSERT OR IGNORE INTO "{daily_table}" (date, cases)
-            VALUES (?, ?)
-            """, (row['date'].strftime('%Y-%m-%d'), row.get('cases')))
-
-        # Update weekly aggregation
-        weekly_data = conn.execute(f"""
-        WITH daily_cases AS (
-            SELECT
-                date,
-                cases - LAG(cases, 1) OVER (ORDER BY date) AS daily_cases
-            FROM "{daily_table}"
-            WHERE cases IS NOT NULL
-            AND date BETWEEN ? AND ?
-        )
-        SELECT
-            CAST(strftime('%Y', date) AS INTEGER) * 100 + CAST(strftime('%W', date) AS INTEGER) AS week_id,
-            SUM(daily_cases) AS weekly_cases
-        FROM daily_cases
-        WHERE daily_cases IS NOT NULL
-        GROUP BY week_id
-        ORDER BY week_id
-        """, (START_DATE.strftime('%Y-%m-%d'), END_DATE.strftime('%Y-%m-%d'))).fetchall()
-        
-        for week_id, weekly_cases in weekly_data:
-            conn.execute(f"""
-            INSERT OR REPLACE INTO "{table_name}" (week_id, weekly_cases)
-            VALUES (?, ?)
-            """, (week_id, weekly_cases))
-
-        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        summaries = [write_covid_data(conn, data, table_name) for data, table_name in datasets]
+        conn.execute("COMMIT")
 
         # Print status
-        new_count = conn.execute(f'SELECT COUNT(*) FROM "{daily_table}"').fetchone()[0]
-        weekly_count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
-
-        increment_run_count(table_name)
-        current_run = run_count + 1
-        print(f"COVID data processing complete for {table_name} (Run {current_run}):")
-        print(f"- Previous daily records: {current_count}")
-        print(f"- New daily records: {new_count}")
-        print(f"- Records added this run: {new_count - current_count}")
-        print(f"- Weekly aggregated data: {weekly_count} rows")
+        for summary in summaries:
+            table_name, current_run, fetched, changed, weekly_count = summary
+            print(f"COVID data processing complete for {table_name} (Run {current_run}):")
+            print(f"- Daily records fetched: {fetched}")
+            print(f"- Records added or revised this run: {changed}")
+            print(f"- Weekly aggregated data: {weekly_count} rows")
 
     except Exception as e:
         print(f"Error in store_covid_data: {str(e)}")
-        if conn:
-            conn.rollback()
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
         raise
-    finally:
-        if conn:
-            conn.close()
 
-def fetch_and_store_michigan_covid():
-    api_key = get_api_key(COVID_API_KEY_ENV)
-    url = f"{COVID_BASE_URL}/state/MI.timeseries.json?apiKey={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json().get("actualsTimeseries", [])
-        store_covid_data(data, "weekly_michigan_covid_data")
+def write_cache_file(path, body):
+    """Write body to path atomically so a partial write is never read back as fresh"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+async def get_json(session, url, params=None, is_valid=None):
+    """
+    GET a JSON payload, served from the disk cache while it is fresh.
+    Only payloads accepted by is_valid are cached, so API errors returned
+    with a 2xx status are fetched again on the next run.
+    """
+    cache_path = get_cache_path(url, params)
+    if is_cache_fresh(cache_path, HTTP_CACHE_TTL):
+        with open(cache_path, "rb") as f:
+            try:
+                return orjson.loads(f.read())
+            except orjson.JSONDecodeError:
+                pass
+
+    body = await fetch_body(session, url, params)
+    data = orjson.loads(body)
+    if is_valid is not None and is_valid(data):
+        write_cache_file(cache_path, body)
+    return data
+
+async def fetch_body(session, url, params=None):
+    """GET a raw response body, retrying transient failures with exponential backoff"""
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+                    response.raise_for_status()
+                    too_large = f"Response from {response.url.host} exceeds {HTTP_MAX_RESPONSE_BYTES} bytes"
+                    if (response.content_length or 0) > HTTP_MAX_RESPONSE_BYTES:
+                        raise ValueError(too_large)
+
+                    # Read in chunks so a body without Content-Length is still bounded
+                    chunks = []
+                    total = 0
+                    async for chunk in response.content.iter_chunked(HTTP_READ_CHUNK_BYTES):
+                        total += len(chunk)
+                        if total > HTTP_MAX_RESPONSE_BYTES:
+                            raise ValueError(too_large)
+                        chunks.append(chunk)
+                    return b"".join(chunks)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        await asyncio.sleep(HTTP_BACKOFF_FACTOR * 2 ** attempt)
+
+async def run_store(write_lock, store_func, *args):
+    """Run a blocking store function in a worker thread, one writer at a time"""
+    loop = asyncio.get_running_loop()
+    async with write_lock:
+        await loop.run_in_executor(None, store_func, *args)
+
+async def fetch_and_store_covid_data(session, write_lock):
+    paths = {
+        "weekly_michigan_covid_data": "state/MI.timeseries.json",
+        "weekly_national_covid_data": "country/US.timeseries.json"
+    }
+
+    # Check if we already have complete data before downloading anything;
+    # this runs before the first await, so no store is in progress yet
+    conn = get_db_connection()
+    for table_name in list(paths):
+        if get_table_row_count(conn, table_name) >= EXPECTED_WEEKS:
+            print(f"{table_name} already complete. Skipping collection.")
+            del paths[table_name]
+    if not paths:
+        return
 
-def fetch_and_store_national_covid():
     api_key = get_api_key(COVID_API_KEY_ENV)
-    url = f"{COVID_BASE_URL}/country/US.timeseries.json?apiKey={api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json().get("actualsTimeseries", [])
-        store_covid_data(data, "weekly_national_covid_data")
+    urls = {table_name: f"{COVID_BASE_URL}/{path}?apiKey={api_key}" for table_name, path in paths.items()}
 
-def fetch_and_store_flu_data():
+    results = await asyncio.gather(
+        *(get_json(session, url, is_valid=lambda data: "actualsTimeseries" in data) for url in urls.values()),
+        return_exceptions=True
+    )
+
+    # A region whose request was refused is skipped; any other failure propagates
+    datasets = []
+    for table_name, result in zip(urls, results):
+        if isinstance(result, aiohttp.ClientResponseError):
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        datasets.append((result.get("actualsTimeseries", []), table_name))
+
+    if datasets:
+        await run_store(write_lock, store_covid_data, datasets)
+
+async def fetch_and_store_flu_data(session, write_lock):
+    # Check if we already have complete data before downloading anything;
+    # this runs before the first await, so no store is in progress yet
+    expected_rows = len(FLU_REGIONS) * EXPECTED_WEEKS
+    if get_table_row_count(get_db_connection(), "flu_data_march_2020_to_2023") >= expected_rows:
+        print("Flu data already complete. Skipping collection.")
+        return
+
+    api_key = get_api_key(FLU_API_KEY_ENV)
+    params = {"regions": ",".join(FLU_REGIONS.keys()), "epiweeks": FLU_EPIWEEKS, "auth": api_key}
     try:
-        conn = get_db_connection()
-        run_count = get_run_count("flu_data_march_2020_to_2023")
+        data = await get_json(session, FLU_BASE_URL, params=params, is_valid=lambda data: data.get("result") == 1)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        # ValueError covers the response size cap and malformed JSON
+        print(f"Request failed: {e}")
+        return
+    await run_store(write_lock, store_flu_data, data)
+
+async def fetch_and_store_all_data():
+    """Fetch the COVID and flu payloads concurrently and store each as it arrives"""
+    # SQLite allows a single writer, so every store from the fetchers holds this lock;
+    # it is created here so it belongs to the event loop that is running it
+    write_lock = asyncio.Lock()
+
+    # One pooled session lets the COVID and flu requests share connections
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(
+            fetch_and_store_covid_data(session, write_lock),
+            fetch_and_store_flu_data(session, write_lock)
+        )
 
-        # Check if we already have complete data (run 5+)
-        if run_count >= 5:
-            print("Flu data already complete. Skipping collection.")
-            return
+def store_flu_data(data):
+    conn = get_db_connection()
+    try:
+        if data["result"] == 1:
+            df = pd.DataFrame(data["epidata"])
+            df["region_key"] = df["region"].map(FLU_REGIONS)
+
+            # Resolve each distinct epiweek once, then derive the columns vectorized
+            start_dates = {
+                ew: pd.Timestamp(Week(int(ew) // 100, int(ew) % 100).startdate())
+                for ew in df["epiweek"].unique()
+            }
+            dates = df["epiweek"].map(start_dates)
+            df["date"] = dates.dt.strftime('%Y-%m-%d')
+            df["week_id"] = week_id_series(dates)
+
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Insert new records in a single batch
+            cols = ["region_key", "date", "week_id", "num_ili"]
+            added = conn.executemany("""
+            INSERT OR IGNORE INTO flu_data_march_2020_to_2023
+            (region_key, date, week_id, num_ili)
+            VALUES (?, ?, ?, ?)
+            """, df[cols].itertuples(index=False, name=None)).rowcount
+
+            current_run = record_run(conn, "flu_data_march_2020_to_2023")
+            conn.execute("COMMIT")
+            
+            # Print status
+            print(f"Flu data processing complete (Run {current_run}):")
+            print(f"- Records fetched: {len(df)}")
+            print(f"- Records added this run: {added}")
+            
+        else:
+            print(f"API Error: {data['message']}")
+            
+    except Exception as e:
+        print(f"Error in store_flu_data: {str(e)}")
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
 
-        # Get current data count
-        current_count = conn.execute("SELECT COUNT(*) FROM flu_data_march_2020_to_2023").fetchone()[0] or 0
+def collect_all_data():
+    """Initialize database and collect all data"""
+    try:
+        # Create database and tables if they don't exist
+        if not create_database():
+            print("Failed to create database. Exiting.")
+            return False
 
-        regions = {"mi": 1, "nat": 2}
-        epiweeks = "202010-202310"
-        base_url = "https://api.delphi.cmu.edu/epidata/fluview/"
-        api_key = get_api_key(FLU_API_KEY_ENV)
-        params = {"regions": ",".join(regions.keys()), "epiweeks": epiweeks, "auth": api_key}
+        # Collect data from all sources
+        process_weather_data(MICHIGAN_LOCATION, START_DATE, END_DATE, "michigan_weather_data")
 
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        asyncio.run(fetch_and_store_all_data())
+        return True
+    except Exception as e:
+        print(f"Error collecting data: {str(e)}")
+        return False
+    finally:
+        close_db()
 
-        if data["result"] == 1:
-            df = pd.DataFrame(data["epidata"])
-            df["region_key"] = df["region"].map(regions)
-            df["date"] = df["epiweek"].apply(
-                lambda ew: Week(int(str(ew)[:4]), int(str(ew)[4:])).startdate().strftime('%Y-%m-%d')
-            )
-            df["week_id"] = df["date"].apply(lambda d: get_week_id(d))
-
-            # For runs 1-4, limit to next 25 rows after current count
-            if run_count < 4:
-                df = df.iloc[current_count:current_count + 25]
-
-            # Insert new records
-            for _, row in df.iterrows():
-                conn.execute("""
-                INSERT OR IGNORE INTO flu_data_march_2020_to_2023
-                (region_key, date, week_id, num_ili)
-                VALUES (?, ?, ?, ?)
-                """, (row["region_key"], row["date"], row["week_id"], row["num_ili"]))
-
-            conn.commit()
-            
-            # Print status
-            new_count = conn.execute("SELECT COUNT(*) FROM flu_data_march_2020_to_2023").fetchone()[0]
-            
-            increment_run_count("flu_data_march_2020_to_2023")
-            current_run = run_count + 1
-            print(f"Flu data processing complete (Run {current_run}):")
-            print(f"- Previous records: {current_count}")
-            print(f"- New records: {new_count}")
-            print(f"- Records added this run: {new_count - current_count}")
-            
-        else:
-            print(f"API Error: {data['message']}")
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
-
-def collect_all_data():
-    """Initialize database and collect all data"""
-    # Create database and tables if they don't exist
-    if not create_database():
-        print("Failed to create database. Exiting.")
-        return False
-        
-    # Initialize run counts table
-    initialize_run_counts()
-    
-    # Collect data from all sources
-    try:
-        process_weather_data(MICHIGAN_LOCATION, START_DATE, END_DATE, "michigan_weather_data")
-        fetch_and_store_michigan_covid()
-        fetch_and_store_national_covid()
-        fetch_and_store_flu_data()
-        return True
-    except Exception as e:
-        print(f"Error collecting data: {str(e)}")
-        return False
-
-if __name__ == "__main__":
-    collect_all_data()
+if __name__ == "__main__":
+    collect_all_data()